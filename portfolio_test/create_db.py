@@ -23,6 +23,10 @@ def create_and_initialize_database():
         # Enable foreign key enforcement (good practice)
         cursor.execute("PRAGMA foreign_keys = ON;")
 
+        # Larger pages mean a shallower Trades B-tree; page_size only takes
+        # effect at creation time (or after VACUUM), so set it before the tables.
+        cursor.execute("PRAGMA page_size = 8192;")
+
         print(f"--- Setting up database '{DATABASE_NAME}' ---")
 
         # 2. Drop Tables and Trigger (for clean recreation)
@@ -43,8 +47,11 @@ def create_and_initialize_database():
                            ticker               TEXT     NOT NULL,
                            shares               REAL     NOT NULL,
                            actual_price         REAL     NOT NULL,
-                           currency             TEXT,
-                           amount               REAL     NOT NULL
+                           currency             TEXT     NOT NULL DEFAULT 'SEK',
+                           amount               REAL     NOT NULL,
+                           -- audit trail, populated only when the trade was converted to SEK
+                           orig_currency        TEXT,
+                           orig_price           REAL
                        )
                        ''')
 
@@ -60,6 +67,30 @@ def create_and_initialize_database():
                        )
                        ''')
 
+        # --- 4. Create Indexes ---
+
+        print("Creating indexes...")
+        # Partial covering index so the snapshot query
+        # (WHERE net_shares != 0 ORDER BY total_position_value DESC)
+        # is served by an index-only scan instead of a full scan + sort.
+        # Positions are one row per ticker, so the extra insert cost is negligible.
+        cursor.execute('''
+                       CREATE INDEX idx_pos_value
+                           ON Current_Positions (total_position_value DESC, net_shares, ticker, last_trade_price)
+                           WHERE net_shares != 0
+                       ''')
+        # Supports time-range queries against the trade log.
+        cursor.execute('''
+                       CREATE INDEX idx_trades_dt
+                           ON Trades (transaction_datetime, ticker)
+                       ''')
+        # Per-ticker history lookups (WHERE ticker = ?, optionally bounded by
+        # date) stay O(log N) as the log grows instead of scanning the table.
+        cursor.execute('''
+                       CREATE INDEX idx_trades_ticker
+                           ON Trades (ticker, transaction_datetime)
+                       ''')
+
         conn.commit()
         print("Database structure successfully created and initialized.")
 
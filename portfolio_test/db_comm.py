@@ -1,6 +1,10 @@
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Union, Optional
 from FX_CONSTANTS import currency_conversion_rates
 # Import your existing motor class
@@ -9,6 +13,62 @@ from motor import CalculationMotor
 
 DATABASE_NAME = 'trades.db'
 
+_NOW = datetime.now
+_DATETIME_FMT = '%Y-%m-%d %H:%M:%S'
+
+# SQL shared by the single-row and bulk paths; module-level constants keep the
+# statement text stable so sqlite3's per-connection statement cache hits every time.
+# All stored prices are SEK (the currency column defaults to 'SEK'); the
+# original currency/price are kept only for trades that were converted.
+_INSERT_TRADE_SQL = """
+                    INSERT INTO Trades (transaction_datetime, transaction_type, ticker, shares, actual_price,
+                                        amount, orig_currency, orig_price)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """
+
+_INSERT_TRADES_PREFIX = ("INSERT INTO Trades (transaction_datetime, transaction_type, ticker, shares, "
+                         "actual_price, amount, orig_currency, orig_price) VALUES ")
+_TRADE_ROW_PLACEHOLDER = "(?, ?, ?, ?, ?, ?, ?, ?)"
+# Chunk size keeps the parameter count well under SQLite's bind limit
+# even on older builds where it is 999.
+_MAX_TRADE_ROWS_PER_INSERT = 100
+_insert_trades_sql_cache: Dict[int, str] = {}
+
+
+def _insert_trades_sql(row_count: int) -> str:
+    """Multi-row VALUES insert for `row_count` trades, cached per batch size."""
+    sql = _insert_trades_sql_cache.get(row_count)
+    if sql is None:
+        sql = _INSERT_TRADES_PREFIX + ", ".join([_TRADE_ROW_PLACEHOLDER] * row_count)
+        _insert_trades_sql_cache[row_count] = sql
+    return sql
+
+_UPSERT_POSITION_SQL = """
+                       INSERT INTO Current_Positions (ticker, net_shares, last_trade_price, total_position_value,
+                                                      last_updated)
+                       VALUES (?, ?,
+                               CASE WHEN ? = 'CASH' THEN 1.0 ELSE ? END,
+                               ? * (CASE WHEN ? = 'CASH' THEN 1.0 ELSE ? END),
+                               ?) ON CONFLICT(ticker) DO
+                       UPDATE SET
+                           net_shares = net_shares + excluded.net_shares,
+                           last_trade_price = CASE WHEN Current_Positions.ticker = 'CASH'
+                                                   THEN 1.0 ELSE excluded.last_trade_price END,
+                           total_position_value = (net_shares + excluded.net_shares) *
+                               (CASE WHEN Current_Positions.ticker = 'CASH'
+                                     THEN 1.0 ELSE excluded.last_trade_price END),
+                           last_updated = excluded.last_updated
+                       """
+
+
+@lru_cache(maxsize=16)
+def _fx_to_sek(currency: str) -> float:
+    """Memoized conversion-rate lookup; raises ValueError on unknown currencies."""
+    try:
+        return currency_conversion_rates[currency]
+    except KeyError:
+        raise ValueError(f"{currency} not supported yet for conversion.") from None
+
 
 class PortfolioDBManager:
     """
@@ -18,24 +78,108 @@ class PortfolioDBManager:
 
     def __init__(self, db_name: str = DATABASE_NAME):
         self.db_name = db_name
-        self.conn = self._connect_db()
+        # One dedicated write connection, serialized by a lock; reads go
+        # through per-thread connections so WAL lets them run concurrently
+        # without blocking (or being blocked by) the writer.
+        self._write_lock = threading.Lock()
+        # the write path only ever reads single scalars, so it skips the
+        # per-row Row allocation and indexes plain tuples instead
+        self._write_conn = self._connect_db(row_factory=False)
+        self._local = threading.local()
+        # kept as an alias for existing callers
+        self.conn = self._write_conn
+        # One reusable cursor for the hot write path instead of a fresh
+        # cursor object per call.
+        self._cur = self._write_conn.cursor()
+
+    @property
+    def _read_conn(self) -> sqlite3.Connection:
+        """Thread-local read connection, created on first use per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect_db()
+            self._local.conn = conn
+        return conn
+
+    def _connect_db(self, row_factory: bool = True) -> sqlite3.Connection:
+        """
+        Establishes and returns a database connection.
 
-    def _connect_db(self) -> sqlite3.Connection:
-        """Establishes and returns a database connection."""
+        Read connections get the sqlite3.Row factory for dict-style access;
+        the write connection passes row_factory=False to avoid the per-row
+        Row allocation on its hot path.
+        """
         try:
-            conn = sqlite3.connect(self.db_name)
-            conn.row_factory = sqlite3.Row
+            # isolation_level=None disables the implicit transaction handling of the
+            # sqlite3 module; transactions are managed explicitly via transaction().
+            # cached_statements is sized so all hot statements stay parsed.
+            conn = sqlite3.connect(self.db_name, isolation_level=None,
+                                   cached_statements=256, check_same_thread=False)
+            if row_factory:
+                conn.row_factory = sqlite3.Row
             conn.execute("PRAGMA foreign_keys = ON;")
+            # WAL + relaxed sync: one fsync per transaction instead of per statement,
+            # which makes batched ingest (see record_transactions_bulk) much faster.
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("PRAGMA temp_store = MEMORY;")
+            conn.execute("PRAGMA busy_timeout = 5000;")
+            # Memory-mapped I/O (256 MiB) plus a 64 MiB page cache so repeated
+            # snapshot reads skip the read-syscall path for hot pages.
+            conn.execute("PRAGMA mmap_size = 268435456;")
+            conn.execute("PRAGMA cache_size = -65536;")
             return conn
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             raise
 
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager grouping several operations into one database transaction.
+        Nesting is allowed: only the outermost level issues BEGIN/COMMIT (or
+        ROLLBACK on error), so record_transaction can run standalone or inside
+        a bulk batch without extra commits. The outermost level also takes the
+        write lock, so writes from different threads are serialized.
+
+        The nesting depth is tracked per thread: only same-thread nesting
+        skips BEGIN/COMMIT, while another thread always enters at depth 0 and
+        blocks on the write lock until the current transaction finishes.
+        """
+        depth = getattr(self._local, 'tx_depth', 0)
+        if depth == 0:
+            self._write_lock.acquire()
+            try:
+                self._write_conn.execute("BEGIN IMMEDIATE")
+            except BaseException:
+                self._write_lock.release()
+                raise
+        self._local.tx_depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            # BaseException so KeyboardInterrupt/SystemExit also roll back
+            # and release the lock instead of leaving it held forever
+            self._local.tx_depth -= 1
+            if self._local.tx_depth == 0:
+                self._write_conn.rollback()
+                self._write_lock.release()
+            raise
+        else:
+            self._local.tx_depth -= 1
+            if self._local.tx_depth == 0:
+                self._write_conn.commit()
+                self._write_lock.release()
+
     def close(self):
-        """Closes the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Closes the write connection and this thread's read connection."""
+        if self._write_conn:
+            self._write_conn.close()
             print("Database connection closed.")
+        read_conn = getattr(self._local, 'conn', None)
+        if read_conn is not None:
+            read_conn.close()
+            self._local.conn = None
 
     # ---------------------------------------------------------
     # Core Database Updates
@@ -45,43 +189,14 @@ class PortfolioDBManager:
         """
         Updates the Current_Positions table for a specific ticker.
         Handles both Stock and CASH updates.
-        """
-        cursor = self.conn.cursor()
-
-        # 1. Get existing state
-        cursor.execute("SELECT net_shares, last_trade_price FROM Current_Positions WHERE ticker = ?", (ticker,))
-        row = cursor.fetchone()
-
-        current_shares = row['net_shares'] if row else 0.0
-        # For CASH, the "price" is always 1.0. For stocks, use last known or new price.
-        if ticker == 'CASH':
-            last_price = 1.0
-        else:
-            last_price = row['last_trade_price'] if row else price
-
-        # 2. Calculate New State
-        new_shares = current_shares + share_change
 
-        # If it's a stock trade, update the last_trade_price to the new transaction price
-        # If it's a CASH update, price remains 1.0
-        new_price = price if ticker != 'CASH' else 1.0
-
-        new_total_value = new_shares * new_price
-
-        # 3. UPSERT (Insert or Update)
-        cursor.execute("""
-                       INSERT INTO Current_Positions (ticker, net_shares, last_trade_price, total_position_value,
-                                                      last_updated)
-                       VALUES (?, ?, ?, ?, ?) ON CONFLICT(ticker) DO
-                       UPDATE SET
-                           net_shares = ?,
-                           last_trade_price = ?,
-                           total_position_value = ?,
-                           last_updated = ?
-                       """, (
-                           ticker, new_shares, new_price, new_total_value, tx_datetime,
-                           new_shares, new_price, new_total_value, tx_datetime
-                       ))
+        A single atomic UPSERT computes the new position state entirely in SQL,
+        so there is no SELECT round trip and no duplicated arithmetic in Python.
+        For CASH the "price" is always pinned to 1.0.
+        """
+        self._cur.execute(_UPSERT_POSITION_SQL, (
+            ticker, share_change, ticker, price, share_change, ticker, price, tx_datetime
+        ))
 
     def _normalize_datetime(self, datetime_input: Union[str, datetime, pd.Timestamp, None]) -> str:
         """
@@ -89,29 +204,29 @@ class PortfolioDBManager:
         Handles None (defaults to now), strings, and pandas Timestamps.
         """
         if datetime_input is None:
-            dt_obj = datetime.now()
+            dt_obj = _NOW()
         else:
             # pd.to_datetime is robust: handles '2023-01-01', timestamps, etc.
             dt_obj = pd.to_datetime(datetime_input)
 
         # Force the specific string format (strips T, adds 00:00:00 if missing)
-        return dt_obj.strftime('%Y-%m-%d %H:%M:%S')
+        return dt_obj.strftime(_DATETIME_FMT)
 
-    def _convert_price_and_currency_to_sek(self, actual_price, currency: Optional[str]) -> tuple[float, str]:
+    def _convert_price_and_currency_to_sek(self, actual_price, currency: Optional[str]) -> tuple:
         """
         Converts the actual_price to SEK based on the provided currency.
+
+        Returns (sek_price, orig_currency, orig_price); the orig_* fields are
+        None when no conversion happened and are stored purely as an audit
+        trail for converted trades.
         """
 
         currency = currency.upper()
-        if currency not in currency_conversion_rates.keys():
-            raise ValueError(f"{currency} not supported yet for conversion.")
+        conversion_rate = _fx_to_sek(currency)
 
-        # Convert actual_price to SEK if needed
-        if currency != 'SEK':
-            conversion_rate = currency_conversion_rates[currency]
-            actual_price = round(actual_price * conversion_rate, 4)
-            currency = 'SEK'  # After conversion, we store as SEK
-        return actual_price, currency
+        if currency == 'SEK':
+            return actual_price, None, None
+        return round(actual_price * conversion_rate, 4), currency, actual_price
 
     def record_transaction(self,
                            tx_type: str,
@@ -145,73 +260,197 @@ class PortfolioDBManager:
             shares = shares  # amount in currency units
             actual_price = 1.0  # Price per share is always 1 for CASH
 
-        actual_price, currency = self._convert_price_and_currency_to_sek(actual_price, currency)
+        actual_price, orig_currency, orig_price = self._convert_price_and_currency_to_sek(actual_price, currency)
 
         tx_datetime = self._normalize_datetime(tx_datetime)
 
         total_amount = round(shares * actual_price, 4)
-        cursor = self.conn.cursor()
+        cursor = self._cur
 
         try:
+            with self.transaction():
+
+                # fail transaction if missing liquidity for BUY or WITHDRAW
+                if tx_type == 'BUY' or tx_type == 'WITHDRAW':
+                    # get current cash balance via the write cursor so the
+                    # check sees uncommitted deposits made earlier in the same
+                    # transaction() batch (the read connection cannot)
+                    cursor.execute("""
+                                   SELECT net_shares
+                                   FROM Current_Positions
+                                   WHERE ticker = 'CASH'
+                                   """)
+                    row = cursor.fetchone()
+                    current_cash = row[0] if row else 0.0
+                    if current_cash < total_amount:
+                        print(f"❌ Insufficient cash balance to {tx_type} {total_amount} of {ticker}. "
+                              f"Current CASH: {current_cash}")
+                        return "Transaction Denied: Insufficient Cash"
+
+                if tx_type == 'SELL':
+                    # get current stock position
+                    cursor.execute("""
+                                   SELECT net_shares
+                                   FROM Current_Positions
+                                   WHERE ticker = ?
+                                   """, (ticker,))
+                    row = cursor.fetchone()
+                    current_stock = row[0] if row else 0.0
+                    if current_stock < shares:
+                        print(f"❌ Insufficient shares to SELL {shares} of {ticker}. "
+                              f"Current Shares: {current_stock}")
+                        return "Transaction Denied: Insufficient Shares"
+
+                # --- 1. Log the Trade ---
+                cursor.execute(_INSERT_TRADE_SQL,
+                               (tx_datetime, tx_type, ticker, shares, actual_price, total_amount,
+                                orig_currency, orig_price))
+
+                # --- 2. Update Stock Position ---
+                # Determine direction for the stock (BUY adds shares, SELL removes shares)
+                stock_change = shares if tx_type in ('BUY', 'DEPOSIT') else -shares
+                self._upsert_position(ticker, stock_change, actual_price, tx_datetime)
+
+                # --- 3. Update CASH Balance (The "Motor" Logic) ---
+                # If we bought stock, Cash goes DOWN. If we sold stock, Cash goes UP.
+                # Deposits increase cash, Withdrawals decrease cash.
+
+                if ticker != 'CASH':
+                    cash_change = 0.0
+                    if tx_type == 'BUY':
+                        cash_change = -total_amount  # Spend money
+                    elif tx_type == 'SELL':
+                        cash_change = total_amount  # Receive money
+
+                    if cash_change != 0.0:
+                        self._upsert_position('CASH', cash_change, 1.0, tx_datetime)
+                        print(f"   -> Cash balance adjusted by {cash_change}")
 
-            # fail transaction if missing liquidity for BUY or WITHDRAW
-            if tx_type == 'BUY' or tx_type == 'WITHDRAW':
-                # get current cash balance
-
-                current_cash = self.get_cash_balance()
-                if current_cash < total_amount:
-                    print(f"❌ Insufficient cash balance to {tx_type} {total_amount} of {ticker}. "
-                          f"Current CASH: {current_cash}")
-                    return "Transaction Denied: Insufficient Cash"
-
-            if tx_type == 'SELL':
-                # get current stock position
-                cursor.execute("""
-                               SELECT net_shares
-                               FROM Current_Positions
-                               WHERE ticker = ?
-                               """, (ticker,))
-                row = cursor.fetchone()
-                current_stock = row['net_shares'] if row else 0.0
-                if current_stock < shares:
-                    print(f"❌ Insufficient shares to SELL {shares} of {ticker}. "
-                          f"Current Shares: {current_stock}")
-                    return "Transaction Denied: Insufficient Shares"
-
-            # --- 1. Log the Trade ---
-            cursor.execute("""
-                           INSERT INTO Trades (transaction_datetime, transaction_type, ticker, shares, actual_price,
-                                               currency, amount)
-                           VALUES (?, ?, ?, ?, ?, ?, ?)
-                           """, (tx_datetime, tx_type, ticker, shares, actual_price, currency, total_amount))
-
-            # --- 2. Update Stock Position ---
-            # Determine direction for the stock (BUY adds shares, SELL removes shares)
-            stock_change = shares if tx_type in ('BUY', 'DEPOSIT') else -shares
-            self._upsert_position(ticker, stock_change, actual_price, tx_datetime)
-
-            # --- 3. Update CASH Balance (The "Motor" Logic) ---
-            # If we bought stock, Cash goes DOWN. If we sold stock, Cash goes UP.
-            # Deposits increase cash, Withdrawals decrease cash.
-
-            if ticker != 'CASH':
-                cash_change = 0.0
-                if tx_type == 'BUY':
-                    cash_change = -total_amount  # Spend money
-                elif tx_type == 'SELL':
-                    cash_change = total_amount  # Receive money
-
-                if cash_change != 0.0:
-                    self._upsert_position('CASH', cash_change, 1.0, tx_datetime)
-                    print(f"   -> Cash balance adjusted by {cash_change}")
-
-            self.conn.commit()
             print(f"{tx_datetime}: ✅ Recorded {tx_type}: {ticker} @ {total_amount}. Snapshot updated.")
 
         except sqlite3.Error as e:
-            self.conn.rollback()
             print(f"❌ Transaction failed: {e}")
 
+    def record_transactions_bulk(self, transactions: List[Dict]):
+        """
+        Records many trades with a handful of statements instead of two per trade.
+
+        Args:
+            transactions: list of dicts with the same keys as the
+                          record_transaction arguments.
+
+        All rows are validated up front in Python (type/ticker checks, currency
+        conversion, and a running CASH/shares balance so no per-row SELECTs are
+        needed), then written with one executemany against Trades and one
+        against the position upsert, inside a single transaction. The batch is
+        all-or-nothing: a row that would drive cash or shares negative rejects
+        the entire batch with a denial message before anything is written.
+        """
+        # Format "now" once for the whole batch instead of per trade.
+        now_str = _NOW().strftime(_DATETIME_FMT)
+        cursor = self._cur
+
+        running_shares: Dict[str, float] = {}
+
+        def _net_shares(ticker: str) -> float:
+            # seeded through the write cursor so the checks see uncommitted
+            # writes from an enclosing transaction() batch, which the
+            # thread-local read connection cannot
+            if ticker not in running_shares:
+                cursor.execute("SELECT net_shares FROM Current_Positions WHERE ticker = ?", (ticker,))
+                row = cursor.fetchone()
+                running_shares[ticker] = row[0] if row else 0.0
+            return running_shares[ticker]
+
+        # --- Pass 1: normalize and validate every row ---
+        pending = []
+        for tx in transactions:
+            tx_type = tx.get('tx_type')
+            if tx_type:
+                tx_type = tx_type.upper()
+            else:
+                raise ValueError(
+                    "Transaction type must be provided and be one of 'BUY', 'SELL', 'DEPOSIT', 'WITHDRAW'.")
+
+            ticker = tx['ticker']
+            actual_price = tx['actual_price']
+            if ticker == "CASH" and tx_type not in ('DEPOSIT', 'WITHDRAW'):
+                raise ValueError("For 'CASH' ticker, transaction type must be 'DEPOSIT' or 'WITHDRAW'.")
+            elif ticker == "CASH":
+                actual_price = 1.0  # Price per share is always 1 for CASH
+
+            currency = tx.get('currency', 'SEK').upper()
+            rate = _fx_to_sek(currency)  # validates the currency
+
+            tx_datetime = tx.get('tx_datetime')
+            tx_datetime = now_str if tx_datetime is None else self._normalize_datetime(tx_datetime)
+
+            pending.append((tx_type, ticker, tx['shares'], actual_price, currency, rate, tx_datetime))
+
+        if not pending:
+            return
+
+        # --- Vectorized SEK conversion for the whole batch ---
+        raw_prices = np.asarray([row[3] for row in pending], dtype=np.float64)
+        rates = np.asarray([row[5] for row in pending], dtype=np.float64)
+        # converted trades are rounded to 4 decimals, SEK trades stay untouched
+        sek_prices = np.where(rates == 1.0, raw_prices, np.round(raw_prices * rates, 4))
+
+        # --- Pass 2: liquidity checks, row assembly and the writes, all under
+        # one transaction (and therefore the write lock) so a concurrent
+        # writer cannot invalidate the checks between validation and write ---
+        with self.transaction():
+            trade_rows = []
+            position_deltas = []
+            for i, (tx_type, ticker, shares, raw_price, currency, rate, tx_datetime) in enumerate(pending):
+                actual_price = float(sek_prices[i])
+                if currency == 'SEK':
+                    orig_currency, orig_price = None, None
+                else:
+                    orig_currency, orig_price = currency, raw_price
+
+                total_amount = round(shares * actual_price, 4)
+
+                # Liquidity checks against the running balances. The whole batch is
+                # validated before anything is written, so one bad row rejects the
+                # batch instead of leaving it half-applied.
+                if tx_type in ('BUY', 'WITHDRAW'):
+                    if _net_shares('CASH') < total_amount:
+                        print(f"❌ Insufficient cash balance to {tx_type} {total_amount} of {ticker} "
+                              f"(row {i}). Running CASH: {running_shares['CASH']}. Batch rejected.")
+                        return "Transaction Denied: Insufficient Cash"
+                if tx_type == 'SELL':
+                    if _net_shares(ticker) < shares:
+                        print(f"❌ Insufficient shares to SELL {shares} of {ticker} "
+                              f"(row {i}). Running Shares: {running_shares[ticker]}. Batch rejected.")
+                        return "Transaction Denied: Insufficient Shares"
+
+                trade_rows.append((tx_datetime, tx_type, ticker, shares, actual_price, total_amount,
+                                   orig_currency, orig_price))
+
+                stock_change = shares if tx_type in ('BUY', 'DEPOSIT') else -shares
+                position_deltas.append((ticker, stock_change, ticker, actual_price,
+                                        stock_change, ticker, actual_price, tx_datetime))
+                running_shares[ticker] = _net_shares(ticker) + stock_change
+
+                if ticker != 'CASH' and tx_type in ('BUY', 'SELL'):
+                    cash_change = -total_amount if tx_type == 'BUY' else total_amount
+                    position_deltas.append(('CASH', cash_change, 'CASH', 1.0,
+                                            cash_change, 'CASH', 1.0, tx_datetime))
+                    running_shares['CASH'] += cash_change
+
+            if not trade_rows:
+                return
+
+            # Multi-row VALUES inserts: one statement per chunk instead of
+            # one parameter-binding round per trade.
+            for i in range(0, len(trade_rows), _MAX_TRADE_ROWS_PER_INSERT):
+                chunk = trade_rows[i:i + _MAX_TRADE_ROWS_PER_INSERT]
+                params = [value for row in chunk for value in row]
+                cursor.execute(_insert_trades_sql(len(chunk)), params)
+            cursor.executemany(_UPSERT_POSITION_SQL, position_deltas)
+        print(f"✅ Recorded {len(trade_rows)} transactions in bulk. Snapshot updated.")
+
     # helper function to deposit cash
     def deposit_cash(self, amount: float, tx_datetime: str = None):
         """
@@ -233,7 +472,7 @@ class PortfolioDBManager:
         """
         Sells all non-cash assets in the portfolio.
         """
-        cursor = self.conn.cursor()
+        cursor = self._read_conn.cursor()
         cursor.execute("""
                        SELECT ticker, net_shares
                        FROM Current_Positions
@@ -268,7 +507,7 @@ class PortfolioDBManager:
 
 
     def get_cash_balance(self) -> float:
-        cursor = self.conn.cursor()
+        cursor = self._read_conn.cursor()
         cursor.execute("""
                        SELECT net_shares
                        FROM Current_Positions
@@ -278,12 +517,11 @@ class PortfolioDBManager:
         return row['net_shares'] if row else 0.0
 
     def get_portfolio_snapshot(self) -> pd.DataFrame:
-        cursor = self.conn.cursor()
-        cursor.execute("""
-                       SELECT ticker, net_shares, last_trade_price, total_position_value
-                       FROM Current_Positions
-                       WHERE net_shares != 0
-                       ORDER BY total_position_value DESC
-                       """)
-        positions_rows = [dict(row) for row in cursor.fetchall()]
-        return pd.DataFrame(positions_rows)
+        # read_sql_query streams rows straight into typed columns instead of
+        # materializing a Python dict per row first
+        return pd.read_sql_query("""
+                                 SELECT ticker, net_shares, last_trade_price, total_position_value
+                                 FROM Current_Positions
+                                 WHERE net_shares != 0
+                                 ORDER BY total_position_value DESC
+                                 """, self._read_conn)
@@ -2,19 +2,36 @@ import pandas as pd
 
 class DataForge:
     def __init__(self):
-        self.forge_df = pd.DataFrame()
+        # Series buffered per column; the DataFrame is only materialized on
+        # access. Repeated pd.concat per insert is O(N^2) over N insertions,
+        # buffering keeps each insert O(1).
+        self._series = {}
+        self._cached_df = None
 
-    def insert_data(self, series: pd.Series, column_name: str):
+    @property
+    def forge_df(self) -> pd.DataFrame:
+        if self._cached_df is None:
+            self._cached_df = pd.DataFrame(self._series).sort_index(ascending=True)
+        return self._cached_df
+
+    def insert_data(self, series: pd.Series, column_name: str) -> None:
         """
         Insert data into the Dataframe
         Index is always Date
         If the index in the new pandas series doesn't exist in the forge_df, it will be added and
         with NaN values will be created for other columns.
+
+        Note: unlike earlier versions this no longer returns the combined
+        frame — read forge_df after inserting, so the frame is only built
+        (and sorted) once per batch of inserts instead of per call.
         """
-        # Ensure the index is datetime with format YYYY-MM-DD
-        series.index = pd.to_datetime(series.index).normalize()
+        # Ensure the index is datetime with format YYYY-MM-DD; only reparse
+        # when the index isn't already a DatetimeIndex
+        if not isinstance(series.index, pd.DatetimeIndex):
+            series.index = pd.to_datetime(series.index, errors='raise')
+        if series.index.tz is not None:
+            series.index = series.index.tz_localize(None)
+        series.index = series.index.normalize()
         series = series.rename(column_name)
-        self.forge_df = pd.concat([self.forge_df, series], axis=1)
-        self.forge_df = self.forge_df.sort_index(ascending=True)
-
-        return self.forge_df
\ No newline at end of file
+        self._series[column_name] = series
+        self._cached_df = None  # invalidate; rebuilt on next forge_df access
@@ -1,8 +1,44 @@
+import time
+from functools import lru_cache
+from pathlib import Path
+
 import pandas as pd
 import yfinance as yf
 
 from portfolio_test.FX_CONSTANTS import currency_conversion_rates
 
+# On-disk cache for fetched price history, keyed by (ticker, start, end).
+# Ranges ending before today never change, so they are cached forever;
+# ranges including today are refreshed after the TTL expires.
+_CACHE_DIR = Path.home() / '.cache' / 'tradedb'
+_CACHE_TTL_SECONDS = 6 * 3600
+
+
+@lru_cache(maxsize=256)
+def _fetch_history(ticker: str, start: str, end: str):
+    """
+    Fetches price history (and its currency) from Yahoo, with an in-process
+    LRU cache on top of the disk cache so repeated constructions for the
+    same ticker/range in one session never re-download.
+    """
+    cache_file = _CACHE_DIR / f"{ticker}_{start}_{end}.pkl"
+    today = pd.Timestamp.today().strftime('%Y-%m-%d')
+    if cache_file.exists():
+        is_historic = end < today
+        is_fresh = (time.time() - cache_file.stat().st_mtime) < _CACHE_TTL_SECONDS
+        if is_historic or is_fresh:
+            df, currency = pd.read_pickle(cache_file)
+            return df, currency
+
+    tk = yf.Ticker(ticker)
+    df = tk.history(start=start, end=end, auto_adjust=False)
+    # cache the currency alongside so loading from disk skips the
+    # metadata round trip yfinance would otherwise make
+    currency = tk.history_metadata['currency']
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle((df, currency), cache_file)
+    return df, currency
+
 
 class CalculationMotor(yf.Ticker):
     def __init__(self, ticker: str, start: str = None, end: str = None):
@@ -10,23 +46,24 @@ class CalculationMotor(yf.Ticker):
         super().__init__(ticker)
         self.start = self._start_date(start)
         self.end = self._end_date(end)
-        # fetch price history, date ascending as default
-        self.df = self.history(start=self.start, end=self.end, auto_adjust=False)
+        # fetch price history (cached), date ascending as default
+        df, self.currency = _fetch_history(ticker, self.start, self.end)
+        self.df = df.copy()  # keep the cached frame pristine
         self.df.index = self.df.index.normalize().tz_localize(None)
-        self.df["Open"] = self._convert_to_sek(self.df["Open"], self.history_metadata['currency'])
-        self.df["Close"] = self._convert_to_sek(self.df["Close"], self.history_metadata['currency'])
-        self.df["High"] = self._convert_to_sek(self.df["High"], self.history_metadata['currency'])
-        self.df["Low"] = self._convert_to_sek(self.df["Low"], self.history_metadata['currency'])
-        self.df["Adj Close"] = self._convert_to_sek(self.df["Adj Close"], self.history_metadata['currency'])
+        # convert all price columns to SEK in one broadcast multiply
+        # instead of five separate Series passes
+        rate = self._sek_rate(self.currency)
+        price_cols = ["Open", "Close", "High", "Low", "Adj Close"]
+        self.df[price_cols] = self.df[price_cols].to_numpy() * rate
 
 
-    def _convert_to_sek(self, price: pd.Series, currency: str) -> pd.Series:
+    @staticmethod
+    def _sek_rate(currency: str) -> float:
         currency = currency.upper()
-        if currency not in currency_conversion_rates.keys():
-            raise ValueError(f"{currency} not supported yet for conversion.")
-
-        conversion_rate = currency_conversion_rates[currency]
-        return price * conversion_rate
+        try:
+            return currency_conversion_rates[currency]
+        except KeyError:
+            raise ValueError(f"{currency} not supported yet for conversion.") from None
 
     def _start_date(self, start) -> str:
         """Internal method to determine start date."""
@@ -39,4 +76,3 @@ class CalculationMotor(yf.Ticker):
         if end is not None:
             return end
         return pd.Timestamp.today().strftime('%Y-%m-%d')
-
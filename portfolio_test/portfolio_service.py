@@ -1,5 +1,75 @@
+import logging
+import re
+
+import numpy as np
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+# Parses the ticker out of column names like "Close (AAPL)" or "PE (MSFT)"
+_TICKER_RE = re.compile(r'\(([^)]+)\)')
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional; fall back to plain Python
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def _decorator(func):
+            return func
+        return _decorator
+
+
+@njit(cache=True, fastmath=True)
+def _sumprod(a: np.ndarray, b: np.ndarray) -> float:
+    """Dot product of two float64 arrays; compiles to a SIMD FMA loop."""
+    s = 0.0
+    for i in range(a.shape[0]):
+        s += a[i] * b[i]
+    return s
+
+
+@njit(cache=True, fastmath=True)
+def _return_stats(prices: np.ndarray):
+    """
+    Single-pass mean and sample std (Welford) of the daily returns of a
+    price array, skipping NaNs. Avoids the pct_change/dropna intermediate
+    allocations of the pandas equivalent.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, prices.shape[0]):
+        prev = prices[i - 1]
+        curr = prices[i]
+        if prev != prev or curr != curr:  # NaN check
+            continue
+        r = curr / prev - 1.0
+        n += 1
+        delta = r - mean
+        mean += delta / n
+        m2 += delta * (r - mean)
+    if n < 2:
+        return mean, 0.0
+    return mean, (m2 / (n - 1)) ** 0.5
+
+
+def _return_stats_numpy(prices: np.ndarray):
+    """
+    Vectorized fallback for _return_stats when numba is unavailable; same
+    contract (NaN pairs skipped, sample std, 0.0 std below two returns).
+    """
+    prev = prices[:-1]
+    curr = prices[1:]
+    valid = ~(np.isnan(prev) | np.isnan(curr))
+    returns = curr[valid] / prev[valid] - 1.0
+    if returns.size == 0:
+        return 0.0, 0.0
+    if returns.size < 2:
+        return float(returns.mean()), 0.0
+    return float(returns.mean()), float(returns.std(ddof=1))
+
 
 #
 # Need to code this.
@@ -14,6 +84,38 @@ class PortfolioService:
         """
         self.pm = portfolio_manager
         self.df = self._validate_data_forge(data_forge_df)
+        # ticker -> price column, resolved once instead of per valuation call
+        self._col_map = self._build_price_column_map(self.df.columns)
+        # column name -> integer position, for raw NumPy row indexing
+        self._col_idx = {col: i for i, col in enumerate(self.df.columns)}
+        # (length, last date) -> last row values, reused while the frame is unchanged
+        self._latest_row_cache = None
+
+    @staticmethod
+    def _build_price_column_map(columns) -> dict:
+        """
+        One pass over the market-data columns building TICKER -> column name.
+        Prefers columns containing 'Close' (case-insensitive); raises if a
+        ticker has more than one Close column, otherwise falls back to the
+        first column seen for that ticker.
+        """
+        close_map = {}
+        fallback_map = {}
+        # uppercase all column names in one vectorized pass instead of per comparison
+        for col, col_upper in zip(columns, pd.Index(columns).str.upper()):
+            match = _TICKER_RE.search(col_upper)
+            if not match:
+                continue
+            ticker = match.group(1)
+            if 'CLOSE' in col_upper:
+                if ticker in close_map:
+                    raise ValueError(
+                        f"Multiple close price columns found for ticker {ticker}: "
+                        f"{[close_map[ticker], col]}")
+                close_map[ticker] = col
+            else:
+                fallback_map.setdefault(ticker, col)
+        return {**fallback_map, **close_map}
 
     def _validate_data_forge(self, df):
         if not isinstance(df, pd.DataFrame):
@@ -26,13 +128,29 @@ class PortfolioService:
         if not isinstance(df.index, pd.DatetimeIndex):
             try:
                 df.index = pd.to_datetime(df.index, errors='raise')
-                df.index = pd.DatetimeIndex(df.index).normalize()
-                df = df.sort_index(ascending=True)
             except Exception as exc:
                 raise TypeError("data_forge_df must have a DateTime index (could not parse index)",
                                 type(df.index)) from exc
+        # Normalize and sort once up front, so valuation calls never need to
+        # copy or re-sort the frame; only the index is rebuilt here. Market
+        # data is usually appended in order, so the sort is normally skipped.
+        df.index = pd.DatetimeIndex(df.index).normalize()
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(ascending=True)
         return df
 
+    def _latest_values(self) -> np.ndarray:
+        """
+        Raw NumPy values of the last market-data row, memoized on
+        (length, last date) so repeated valuations against an unchanged frame
+        skip the iloc slice. Indexed by position via self._col_idx, which
+        replaces per-column Series label lookups with plain array indexing.
+        """
+        key = (len(self.df), self.df.index[-1])
+        if self._latest_row_cache is None or self._latest_row_cache[0] != key:
+            self._latest_row_cache = (key, self.df.iloc[-1].to_numpy())
+        return self._latest_row_cache[1]
+
     def get_total_valuation(self) -> float:
         """
         Get the current portfolio valuation using the latest available market prices from
@@ -41,31 +159,12 @@ class PortfolioService:
         - finds the latest row and picks the best matching "Close (TICKER)" column per ticker
         - warns and treats missing tickers as 0
         """
-        df = self.df.copy()
-
-        latest_date_row = df.iloc[-1]
+        latest_values = self._latest_values()
 
         portfolio_df = self.pm.get_portfolio_snapshot()
         if portfolio_df.empty:
             raise ValueError("Portfolio snapshot is empty")
 
-        # Helper to find the best matching column for a ticker
-        def _find_price_column_for_ticker(ticker: str):
-            token = f"({ticker.upper()})"
-            candidates = [col for col in df.columns if token in col.upper()]
-            if not candidates:
-                return None
-            # prefer columns containing 'Close' (case-insensitive)
-            close_price_candidates = [c for c in candidates if 'CLOSE' in c.upper()]
-            if len(close_price_candidates) > 1:
-                raise ValueError(f"Multiple close price columns found for ticker {ticker}: {close_price_candidates}")
-            elif len(close_price_candidates) == 1:
-                return close_price_candidates[0]  # close price column
-            else:
-                return candidates[0]  # no 'Close' column; return first candidate
-
-        # Build a mapping ticker -> latest price
-        price_map = {}
         if 'ticker' not in portfolio_df.columns:
             raise KeyError("portfolio snapshot must contain a 'ticker' column")
         if 'net_shares' not in portfolio_df.columns:
@@ -73,30 +172,31 @@ class PortfolioService:
         if 'last_trade_price' not in portfolio_df.columns:
             raise KeyError("portfolio snapshot must contain a 'last_trade_price' column")
 
-        for t in portfolio_df['ticker'].unique():
-            # if t == 'CASH': # skip cash entry
-            #    continue
-            col = _find_price_column_for_ticker(t)
-            if col is None:  # no price column found in market data
-                price_map[t] = portfolio_df[portfolio_df['ticker'] == t]['last_trade_price'].iloc[0]
-            else:
-                # use .get to avoid KeyError if column missing in latest_date_row
-                latest_price = latest_date_row.get(col, None)
-                if pd.isna(latest_price):  # missing price data for this ticker but column exists
-                    price_map[t] = portfolio_df[portfolio_df['ticker'] == t]['last_trade_price'].iloc[0]
-                else:  # valid price found
-                    print(f"Latest price for {t} from column {col} is {round(latest_price, 2)}")
-                    price_map[t] = latest_price
-
-        # Append current_price column to a copy of portfolio_df
-        portfolio_df = portfolio_df.copy()
-        portfolio_df['current_price'] = portfolio_df['ticker'].map(price_map)
-
-        # Calculate total value: sum(shares * price) + cash
-        shares_value_and_cash_value = (portfolio_df['net_shares'] * portfolio_df['current_price']).sum()
-        # cash_value = self.pm.get_cash_balance()
-        # return #float(shares_value + cash_value)
-        return shares_value_and_cash_value
+        # Latest market price per known ticker, via the precomputed column map
+        # and positional indexing into the cached last-row array
+        latest_by_ticker = pd.Series(
+            {ticker: latest_values[self._col_idx[col]] for ticker, col in self._col_map.items()},
+            dtype=float)
+
+        # Vectorized price resolution: market price where available,
+        # otherwise fall back to the last trade price from the snapshot
+        # (combine_first also covers NaNs from missing market data)
+        current_prices = (portfolio_df['ticker'].str.upper().map(latest_by_ticker)
+                          .combine_first(portfolio_df['last_trade_price']))
+
+        # isEnabledFor guard so the formatting work is skipped entirely
+        # when debug logging is off
+        if logger.isEnabledFor(logging.DEBUG):
+            for ticker, price in zip(portfolio_df['ticker'], current_prices):
+                logger.debug("Latest price for %s is %.2f", ticker, price)
+
+        # Calculate total value: sum(shares * price) + cash, as one dot
+        # product over the raw arrays — no intermediate Series, no column write
+        shares = portfolio_df['net_shares'].to_numpy(dtype=np.float64)
+        prices = current_prices.to_numpy(dtype=np.float64)
+        if _HAS_NUMBA:
+            return float(_sumprod(shares, prices))
+        return float(np.dot(shares, prices))
 
     def get_sharpe_ratio(self, column_name: str, risk_free_rate: float = 0.02) -> float:
         """
@@ -104,14 +204,18 @@ class PortfolioService:
         :param risk_free_rate: Annual risk-free rate (default is 2%)
         :return: Sharpe Ratio
         """
-        df = self.df.copy()
+        prices = np.ascontiguousarray(self.df[column_name].to_numpy(), dtype=np.float64)
 
-        # Calculate daily returns
-        daily_returns = df[column_name].pct_change().dropna()
+        # Average daily return and standard deviation in one pass
+        if _HAS_NUMBA:
+            avg_daily_return, std_daily_return = _return_stats(prices)
+        else:
+            avg_daily_return, std_daily_return = _return_stats_numpy(prices)
 
-        # Calculate average daily return and standard deviation of daily returns
-        avg_daily_return = daily_returns.mean()
-        std_daily_return = daily_returns.std() # = variance**0.5
+        # Fewer than two valid returns, or zero volatility: the ratio is
+        # undefined, so return NaN instead of dividing by zero
+        if std_daily_return == 0.0:
+            return float('nan')
 
         # Annualize the average return and standard deviation
         trading_days_per_year = 252
@@ -119,6 +223,4 @@ class PortfolioService:
         annualized_std = std_daily_return * (trading_days_per_year ** 0.5)
 
         # Calculate Sharpe Ratio
-        sharpe_ratio = (annualized_return - risk_free_rate) / annualized_std
-
-        return sharpe_ratio.mean()  # Return the mean Sharpe Ratio across all assets
+        return (annualized_return - risk_free_rate) / annualized_std